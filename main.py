@@ -1,66 +1,243 @@
 # main.py
 
-import base64
+import binascii
+import functools
 import io
+import re
+import tempfile
 import unicodedata
-from fastapi import FastAPI, Response
-from pydantic import BaseModel, Field
-from typing import List, Optional, Dict
+from itertools import islice
+from xml.sax.saxutils import escape
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import StreamingResponse
+from fastapi.concurrency import run_in_threadpool
+from typing import List, NamedTuple, Optional, Dict, Tuple
+
+import msgspec
+import numpy as np
 
 from pptx import Presentation
-from pptx.util import Inches, Pt
-from pptx.enum.text import PP_ALIGN, MSO_VERTICAL_ANCHOR
+from pptx.util import Inches
 from pptx.dml.color import RGBColor
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.oxml import parse_xml
+from pptx.oxml.ns import nsdecls
+from pptx.parts.slide import SlidePart
 from PIL import Image
+import pybase64
+
+try:
+    from itertools import batched
+except ImportError:
+    # Python 3.12 미만: 같은 동작의 islice 구현
+    def batched(iterable, n):
+        iterator = iter(iterable)
+        while batch := tuple(islice(iterator, n)):
+            yield batch
 
-# --- Pydantic 모델 정의 (기존과 동일) ---
-class CenterPosition(BaseModel):
+# --- 요청 모델 정의 (msgspec: JSON 디코딩과 타입 검증을 C 코드에서 한 번에 처리) ---
+# 필드 이름은 Flutter가 보내는 camelCase 키로 자동 변환 (center_position -> centerPosition)
+class CenterPosition(msgspec.Struct):
     dx: float
     dy: float
 
-class TextItem(BaseModel):
+class TextItem(msgspec.Struct, rename='camel', kw_only=True):
     id: str
     text: str
-    center_position: CenterPosition = Field(..., alias='centerPosition')
-    font_size_pt: float = Field(..., alias='fontSizePt')
-    measured_height_pt: Optional[float] = Field(None, alias='measuredHeightPt')
-    color_value: int = Field(..., alias='colorValue')
-    font_weight_bold: bool = Field(..., alias='fontWeightBold')
-    font_family: Optional[str] = Field(None, alias='fontFamily')
-
-class CanvasData(BaseModel):
-    background_image_bytes: Optional[str] = Field(None, alias='backgroundImageBytes')
-    canvas_size: Dict[str, float] = Field(..., alias='canvasSize')
-    canvas_aspect_ratio: Optional[float] = Field(None, alias='canvasAspectRatio')
-    text_items: List[TextItem] = Field(..., alias='textItems')
-    excel_data: List[Dict[str, str]] = Field(..., alias='excelData')
+    center_position: CenterPosition
+    font_size_pt: float
+    measured_height_pt: Optional[float] = None
+    color_value: int
+    font_weight_bold: bool
+    font_family: Optional[str] = None
+
+class CanvasData(msgspec.Struct, rename='camel', kw_only=True):
+    background_image_bytes: Optional[str] = None
+    canvas_size: Dict[str, float]
+    canvas_aspect_ratio: Optional[float] = None
+    text_items: List[TextItem]
+    excel_data: List[Dict[str, str]]
+
+# 타입 정보를 미리 해석해 둔 디코더를 모든 요청에서 재사용
+# strict=False: Pydantic 모델과 같이 "300" 같은 숫자 문자열도 숫자 필드로 받아들임
+canvas_data_decoder = msgspec.json.Decoder(CanvasData, strict=False)
+
+# OpenAPI 문서에 요청 본문 스키마를 싣기 위한 JSON Schema (라우트가 Request를 직접 받으므로 수동 등록)
+(CANVAS_DATA_SCHEMA,), CANVAS_DATA_COMPONENTS = msgspec.json.schema_components(
+    [CanvasData], ref_template="#/components/schemas/{name}"
+)
+
+# msgspec 오류 메시지 끝의 위치 정보 (예: "... - at `$.textItems[0].centerPosition`")
+VALIDATION_ERROR_PATH_RE = re.compile(r" - at `\$(.*)`$")
+VALIDATION_ERROR_PATH_PART_RE = re.compile(r"\.([^.\[\]]+)|\[(\d+)\]")
+VALIDATION_ERROR_MISSING_FIELD_RE = re.compile(r"missing required field `([^`]+)`")
+
+def request_error_detail(error: msgspec.DecodeError) -> List[dict]:
+    # 기존 FastAPI(Pydantic) 422 응답과 같은 [{"loc": [...], "msg": ...}] 형태로 변환
+    message = str(error)
+    loc = ['body']
+    path_match = VALIDATION_ERROR_PATH_RE.search(message)
+    if path_match:
+        message = message[:path_match.start()]
+        # dict 키는 msgspec이 "[...]"로만 알려주므로 loc에서 생략
+        for field_name, index in VALIDATION_ERROR_PATH_PART_RE.findall(path_match.group(1)):
+            loc.append(field_name if field_name else int(index))
+    missing_match = VALIDATION_ERROR_MISSING_FIELD_RE.search(message)
+    if missing_match:
+        loc.append(missing_match.group(1))
+    return [{'loc': loc, 'msg': message}]
 
 app = FastAPI()
 
-def crop_image_to_ratio(img: Image.Image, target_ratio: float) -> Image.Image:
-    # 기존과 동일
+_default_openapi = app.openapi
+
+def openapi_with_request_schemas():
+    # 기본 OpenAPI 문서에 msgspec 모델 스키마를 components로 추가 (처음 한 번만)
+    if app.openapi_schema is None:
+        openapi_schema = _default_openapi()
+        openapi_schema.setdefault('components', {}).setdefault('schemas', {}).update(CANVAS_DATA_COMPONENTS)
+    return app.openapi_schema
+
+app.openapi = openapi_with_request_schemas
+
+# 생성된 pptx는 이 크기까지 메모리에, 넘으면 임시 파일에 기록
+PPTX_SPOOL_MAX_BYTES = 8 << 20
+# 응답으로 보낼 때 한 번에 읽는 크기
+PPTX_STREAM_CHUNK_BYTES = 64 * 1024
+
+# 배경 이미지는 카드 폭 기준 이 해상도(인쇄 품질)를 넘으면 줄여서 삽입
+BACKGROUND_TARGET_DPI = 200
+# 알파 채널이 없는 배경을 다시 인코딩할 때 사용하는 JPEG 품질
+BACKGROUND_JPEG_QUALITY = 85
+
+# base64 스트림 디코딩 단위 (4의 배수여야 청크 경계에서 패딩이 깨지지 않음)
+BASE64_DECODE_CHUNK_CHARS = 64 * 1024
+
+def decode_base64_chunked(encoded: str) -> io.BytesIO:
+    # 전체 문자열을 한 번에 디코딩하지 않고 64KB 단위로 디코딩해 하나의 스트림에 이어 씀
+    # (호출 측은 이 스트림 하나를 seek(0)으로 재사용해 디코딩 결과를 다시 복사하지 않음)
+    if len(encoded) % 4 == 0:
+        decoded = io.BytesIO()
+        try:
+            for start in range(0, len(encoded), BASE64_DECODE_CHUNK_CHARS):
+                decoded.write(pybase64.b64decode(encoded[start:start + BASE64_DECODE_CHUNK_CHARS], validate=False))
+            decoded.seek(0)
+            return decoded
+        except binascii.Error:
+            # 공백 등이 섞여 청크 경계가 어긋난 입력은 아래의 일괄 디코딩으로 처리
+            pass
+    # bytes로 만든 BytesIO는 버퍼를 복사하지 않고 공유
+    return io.BytesIO(pybase64.b64decode(encoded, validate=False))
+
+# --- python-pptx add_slide의 O(N²) 탐색 회피 ---
+# 기본 add_slide는 슬라이드마다 (1) 새 파트와 일치하는 기존 관계를 찾으려고 모든 슬라이드 관계를,
+# (2) 다음 슬라이드 ID를 구하려고 모든 sldId를 훑음. 방금 만든 파트는 기존 관계가 있을 수 없고
+# ID는 호출 측에서 1씩 증가시켜 넘겨주므로 두 탐색을 모두 건너뜀.
+# 레이아웃에서 복제할 placeholder 목록도 슬라이드마다 다시 찾지 않도록 호출 측에서 한 번만 구해 넘김.
+def add_slide_fast(prs, slide_layout, layout_placeholders, slide_id):
+    presentation_part = prs.part
+    slide_part = SlidePart.new(presentation_part._next_slide_partname, presentation_part.package, slide_layout.part)
+    rId = presentation_part._rels._add_relationship(RT.SLIDE, slide_part)
+    slide = slide_part.slide
+    for placeholder in layout_placeholders:
+        slide.shapes.clone_placeholder(placeholder)
+    prs.slides._sldIdLst._add_sldId(id=slide_id, rId=rId)
+    return slide
+
+def downscale_image_to_width(img: Image.Image, target_width_px: int, target_ratio: float) -> Tuple[Image.Image, bool]:
+    # (이미지, 실제로 줄였는지 여부) 반환. 렌더링 시 어차피 축소될 픽셀은 미리 버림
+    if img.width <= target_width_px:
+        return img, False
+
+    target_height_px = max(1, int(target_width_px / target_ratio))
+    return img.resize((target_width_px, target_height_px), Image.Resampling.BICUBIC), True
+
+def crop_image_to_ratio(img: Image.Image, target_ratio: float) -> Tuple[Image.Image, bool]:
+    # (이미지, 실제로 잘렸는지 여부) 반환
     img_width, img_height = img.size
     img_ratio = img_width / img_height
 
     if abs(img_ratio - target_ratio) < 0.01:
-        return img
+        return img, False
 
     if img_ratio > target_ratio:
         new_width = int(target_ratio * img_height)
         offset = (img_width - new_width) // 2
-        return img.crop((offset, 0, offset + new_width, img_height))
+        return img.crop((offset, 0, offset + new_width, img_height)), True
     else:
         new_height = int(img_width / target_ratio)
         offset = (img_height - new_height) // 2
-        return img.crop((0, offset, img_width, offset + new_height))
+        return img.crop((0, offset, img_width, offset + new_height)), True
 
-# --- 🚀 FIX: 함수 로직을 명확하고 정확하게 전면 수정 ---
-def add_cards_on_slide(slide, chunk_data, text_items_template, canvas_size, cropped_background_stream, target_card_ratio):
-    
+# 카드 안 텍스트 아이템의 배치/스타일을 한 번만 계산해 둔 값 (텍스트 아이템 순서대로)
+class TextLayouts(NamedTuple):
+    text_columns: List[Optional[int]]  # 카드별 내용을 가져올 행 튜플의 열 번호 (없으면 고정 텍스트)
+    texts: List[str]                   # 고정 텍스트
+    left_rel_inch: np.ndarray          # 가상 캔버스 좌상단 기준 좌표 (인치)
+    top_rel_inch: np.ndarray
+    box_width_emu: List[int]
+    box_height_emu: List[int]
+    paragraph_props_xmls: List[str]    # 문단 스타일 XML
+
+DEFAULT_FONT_NAME = 'Malgun Gothic'
+
+# 슬라이드 크기 (A4 세로)
+A4_WIDTH = Inches(8.27)
+A4_HEIGHT = Inches(11.69)
+
+# 카드 행 튜플 (이름, 그룹)의 열 번호
+ROW_NAME = 0
+ROW_GROUP = 1
+
+# 길이 단위 변환 상수 (Inches()/Pt() 객체 생성 없이 정수 EMU로 직접 계산)
+EMU_PER_INCH = 914400
+EMU_PER_PT = 12700
+EMU_PER_CENTIPOINT = 127
+
+# --- 슬라이드 도형 XML 템플릿 ---
+# python-pptx의 add_picture / add_textbox + text_frame 설정 결과와 동일한 XML을 직접 만들어
+# 도형 프록시 객체 생성과 요소 단위 파싱을 건너뜀
+PICTURE_XML = (
+    '<p:pic><p:nvPicPr><p:cNvPr id="%d" name="Picture %d" descr="%s"/>'
+    '<p:cNvPicPr><a:picLocks noChangeAspect="1"/></p:cNvPicPr><p:nvPr/></p:nvPicPr>'
+    '<p:blipFill><a:blip r:embed="%s"/><a:stretch><a:fillRect/></a:stretch></p:blipFill>'
+    '<p:spPr><a:xfrm><a:off x="%d" y="%d"/><a:ext cx="%d" cy="%d"/></a:xfrm>'
+    '<a:prstGeom prst="rect"><a:avLst/></a:prstGeom></p:spPr></p:pic>'
+)
+
+TEXTBOX_XML = (
+    '<p:sp><p:nvSpPr><p:cNvPr id="%d" name="TextBox %d"/><p:cNvSpPr txBox="1"/><p:nvPr/></p:nvSpPr>'
+    '<p:spPr><a:xfrm><a:off x="%d" y="%d"/><a:ext cx="%d" cy="%d"/></a:xfrm>'
+    '<a:prstGeom prst="rect"><a:avLst/></a:prstGeom><a:noFill/></p:spPr>'
+    '<p:txBody><a:bodyPr wrap="square" bIns="0" tIns="0" lIns="0" rIns="0" anchor="ctr"><a:spAutoFit/></a:bodyPr>'
+    '<a:lstStyle/><a:p>%s%s</a:p></p:txBody></p:sp>'
+)
+
+# 가운데 정렬 문단 + 기본 글꼴 속성 (크기(centipoints), 굵게, 색상, 글꼴)
+PARAGRAPH_PROPS_XML = (
+    '<a:pPr algn="ctr"><a:defRPr sz="%d" b="%d"><a:solidFill><a:srgbClr val="%s"/></a:solidFill>'
+    '<a:latin typeface="%s"/></a:defRPr></a:pPr>'
+)
+
+SHAPES_CONTAINER_XML = '<p:spTree %s>%%s</p:spTree>' % nsdecls('a', 'p', 'r')
+
+# python-pptx와 동일하게 XML에 쓸 수 없는 제어 문자는 _xHHHH_ 형태로 치환
+CONTROL_CHARS_RE = re.compile(r"([\x00-\x08\x0B-\x1F])")
+LINE_BREAK_RE = re.compile("\n|\v")
+
+def text_runs_xml(text: str) -> str:
+    # 줄바꿈(\n, \v)은 a:br로, 나머지는 a:r 런으로 변환 (빈 런은 만들지 않음)
+    runs = []
+    for idx, line in enumerate(LINE_BREAK_RE.split(text)):
+        if idx > 0:
+            runs.append('<a:br/>')
+        if line:
+            line = CONTROL_CHARS_RE.sub(lambda match: "_x%04X_" % ord(match.group(1)), line)
+            runs.append('<a:r><a:t>%s</a:t></a:r>' % escape(line))
+    return ''.join(runs)
+
+def compute_card_layout(page_width_inch: float, page_height_inch: float, target_card_ratio: float):
     # 1. 고정된 A4 1/4 그리드 정의
-    page_width_inch = slide.part.package.presentation_part.presentation.slide_width.inches
-    page_height_inch = slide.part.package.presentation_part.presentation.slide_height.inches
-    
     grid_width_inch = page_width_inch / 2
     grid_height_inch = page_height_inch / 2
 
@@ -71,133 +248,179 @@ def add_cards_on_slide(slide, chunk_data, text_items_template, canvas_size, crop
         (grid_width_inch, grid_height_inch)
     ]
 
-    # 2. 각 그리드 칸(A4 1/4)에 카드 내용 배치
-    for i, card_data in enumerate(chunk_data):
-        grid_left_inch, grid_top_inch = grid_positions[i]
-
-        # 3. "가상 캔버스" (배경 이미지가 그려질 영역)의 크기와 위치 계산 (BoxFit: Contain 로직)
-        grid_ratio = grid_width_inch / grid_height_inch
-        
-        final_pic_width_inch = grid_width_inch
-        final_pic_height_inch = grid_height_inch
-        pic_left_offset_inch = 0
-        pic_top_offset_inch = 0
-
-        # 받은 카드의 비율(target_card_ratio)에 맞춰 가상 캔버스 크기 조정
-        if target_card_ratio > grid_ratio:
-            # 카드가 그리드보다 넓으면, 높이를 줄여서 비율을 맞춤 (상하 여백 발생)
-            final_pic_height_inch = grid_width_inch / target_card_ratio
-            pic_top_offset_inch = (grid_height_inch - final_pic_height_inch) / 2
-        elif target_card_ratio < grid_ratio:
-            # 카드가 그리드보다 좁으면, 너비를 줄여서 비율을 맞춤 (좌우 여백 발생)
-            final_pic_width_inch = grid_height_inch * target_card_ratio
-            pic_left_offset_inch = (grid_width_inch - final_pic_width_inch) / 2
-
-        # 4. 배경 이미지 배치 (찌그러짐 없음)
-        if cropped_background_stream:
-            cropped_background_stream.seek(0)
-            slide.shapes.add_picture(
-                cropped_background_stream,
-                Inches(grid_left_inch + pic_left_offset_inch),
-                Inches(grid_top_inch + pic_top_offset_inch),
-                width=Inches(final_pic_width_inch),
-                height=Inches(final_pic_height_inch)
-            )
-
-        # 5. 텍스트 배치
-        # Flutter 캔버스의 픽셀 크기
-        canvas_width_px = canvas_size['width']
-        canvas_height_px = canvas_size['height']
-        
-        # 픽셀-인치 변환 비율 (가상 캔버스 기준)
-        pixels_per_inch_w = canvas_width_px / final_pic_width_inch
-        pixels_per_inch_h = canvas_height_px / final_pic_height_inch
-        
-        for item_template in text_items_template:
-            # 텍스트 내용 결정
-            if item_template.id == 'title':
-                text_content = card_data.get('name', '')
-            elif item_template.id == 'subtitle':
-                text_content = card_data.get('group', '')
-            else:
-                text_content = item_template.text
-
-            # Flutter 좌표계를 PPT 좌표계로 변환
-            center_pos_px = item_template.center_position
-            
-            # 텍스트 박스 중심의 절대 좌표 (Flutter 캔버스 좌상단 기준, 픽셀)
-            center_x_abs_px = (canvas_width_px / 2) + center_pos_px.dx
-            center_y_abs_px = (canvas_height_px / 2) - center_pos_px.dy
-
-            # 텍스트 박스 크기 (인치)
-            font_size_pt = item_template.font_size_pt
-            measured_height_pt = item_template.measured_height_pt or font_size_pt
-            
-            box_width_px = canvas_width_px * 0.95 # 너비는 캔버스의 95%
-            box_height_px = (measured_height_pt * (96 / 72)) * 1.2 # 높이는 측정된 높이의 1.2배
-            
-            box_width_inch = box_width_px / pixels_per_inch_w
-            box_height_inch = box_height_px / pixels_per_inch_h
-
-            # 텍스트 박스 좌상단 좌표 (가상 캔버스 좌상단 기준, 인치)
-            left_rel_px = center_x_abs_px - (box_width_px / 2)
-            top_rel_px = center_y_abs_px - (box_height_px / 2)
-
-            left_rel_inch = left_rel_px / pixels_per_inch_w
-            top_rel_inch = top_rel_px / pixels_per_inch_h
-            
-            # 최종 좌표 (그리드 + 가상 캔버스 오프셋 + 텍스트 상대 좌표)
-            final_left_inch = grid_left_inch + pic_left_offset_inch + left_rel_inch
-            final_top_inch = grid_top_inch + pic_top_offset_inch + top_rel_inch
-
-            # 텍스트 박스 추가 및 스타일링
-            txBox = slide.shapes.add_textbox(
-                Inches(final_left_inch),
-                Inches(final_top_inch),
-                Inches(box_width_inch),
-                Inches(box_height_inch)
-            )
-            
-            tf = txBox.text_frame
-            tf.margin_bottom = Pt(0)
-            tf.margin_top = Pt(0)
-            tf.margin_left = Pt(0)
-            tf.margin_right = Pt(0)
-            tf.word_wrap = True
-            tf.vertical_anchor = MSO_VERTICAL_ANCHOR.MIDDLE
-            tf.clear()
-
-            p = tf.paragraphs[0]
-            p.text = text_content
-            p.alignment = PP_ALIGN.CENTER
-
-            font = p.font
-            default_font = 'Malgun Gothic'
-
-            if item_template.font_family:
-                try:
-                    font_name = unicodedata.normalize('NFC', item_template.font_family)
-                    font.name = font_name
-                except Exception:
-                    font.name = default_font
-            else:
-                font.name = default_font
+    # 2. "가상 캔버스" (배경 이미지가 그려질 영역)의 크기와 위치 계산 (BoxFit: Contain 로직)
+    grid_ratio = grid_width_inch / grid_height_inch
+
+    final_pic_width_inch = grid_width_inch
+    final_pic_height_inch = grid_height_inch
+    pic_left_offset_inch = 0
+    pic_top_offset_inch = 0
+
+    # 받은 카드의 비율(target_card_ratio)에 맞춰 가상 캔버스 크기 조정
+    if target_card_ratio > grid_ratio:
+        # 카드가 그리드보다 넓으면, 높이를 줄여서 비율을 맞춤 (상하 여백 발생)
+        final_pic_height_inch = grid_width_inch / target_card_ratio
+        pic_top_offset_inch = (grid_height_inch - final_pic_height_inch) / 2
+    elif target_card_ratio < grid_ratio:
+        # 카드가 그리드보다 좁으면, 너비를 줄여서 비율을 맞춤 (좌우 여백 발생)
+        final_pic_width_inch = grid_height_inch * target_card_ratio
+        pic_left_offset_inch = (grid_width_inch - final_pic_width_inch) / 2
+
+    # 각 그리드 칸에서 가상 캔버스 좌상단의 위치
+    card_origins = [
+        (grid_left_inch + pic_left_offset_inch, grid_top_inch + pic_top_offset_inch)
+        for grid_left_inch, grid_top_inch in grid_positions
+    ]
+    return card_origins, final_pic_width_inch, final_pic_height_inch
+
+@functools.lru_cache(maxsize=256)
+def paragraph_props_xml(font_family: Optional[str], font_size_pt: float, bold: bool, color_value: int) -> str:
+    # 같은 템플릿 스타일은 요청이 달라도 결과가 같으므로 NFC 정규화/색상 변환/이스케이프 결과를 캐시
+    font_name = DEFAULT_FONT_NAME
+    if font_family:
+        try:
+            font_name = unicodedata.normalize('NFC', font_family)
+        except Exception:
+            font_name = DEFAULT_FONT_NAME
+
+    rgb = RGBColor((color_value >> 16) & 0xFF, (color_value >> 8) & 0xFF, color_value & 0xFF)
+
+    return PARAGRAPH_PROPS_XML % (
+        int(font_size_pt * EMU_PER_PT) // EMU_PER_CENTIPOINT,
+        1 if bold else 0,
+        str(rgb),
+        escape(font_name, {'"': '&quot;'}),
+    )
+
+def precompute_text_layouts(text_items_template, canvas_size, pic_width_inch, pic_height_inch) -> TextLayouts:
+    # 카드 데이터와 무관한 좌표/크기/스타일 계산을 요청당 한 번만 수행
+    # Flutter 캔버스의 픽셀 크기
+    canvas_width_px = canvas_size['width']
+    canvas_height_px = canvas_size['height']
+
+    # 픽셀-인치 변환 비율 (가상 캔버스 기준)
+    pixels_per_inch_w = canvas_width_px / pic_width_inch
+    pixels_per_inch_h = canvas_height_px / pic_height_inch
+
+    # Flutter 좌표계를 PPT 좌표계로 변환 (모든 텍스트 아이템을 NumPy 배열로 한 번에 계산)
+    center_dx_px = np.array([item.center_position.dx for item in text_items_template], dtype=np.float64)
+    center_dy_px = np.array([item.center_position.dy for item in text_items_template], dtype=np.float64)
+    measured_height_pt = np.array(
+        [item.measured_height_pt or item.font_size_pt for item in text_items_template], dtype=np.float64
+    )
 
-            font.size = Pt(item_template.font_size_pt)
-            font.bold = item_template.font_weight_bold
-            color_val = item_template.color_value
-            font.color.rgb = RGBColor((color_val >> 16) & 0xFF, (color_val >> 8) & 0xFF, color_val & 0xFF)
+    # 텍스트 박스 중심의 절대 좌표 (Flutter 캔버스 좌상단 기준, 픽셀)
+    center_x_abs_px = (canvas_width_px / 2) + center_dx_px
+    center_y_abs_px = (canvas_height_px / 2) - center_dy_px
+
+    # 텍스트 박스 크기
+    box_width_px = canvas_width_px * 0.95 # 너비는 캔버스의 95%
+    box_height_px = (measured_height_pt * (96 / 72)) * 1.2 # 높이는 측정된 높이의 1.2배
+
+    box_width_inch = box_width_px / pixels_per_inch_w
+    box_height_inch = box_height_px / pixels_per_inch_h
+
+    # 텍스트 박스 좌상단 좌표 (가상 캔버스 좌상단 기준, 인치)
+    left_rel_inch = (center_x_abs_px - (box_width_px / 2)) / pixels_per_inch_w
+    top_rel_inch = (center_y_abs_px - (box_height_px / 2)) / pixels_per_inch_h
+
+    text_columns = []
+    paragraph_props_xmls = []
+    for item_template in text_items_template:
+        # 텍스트 내용 결정 (카드별로 바뀌는 항목은 행 튜플의 열 번호만 기억)
+        if item_template.id == 'title':
+            text_columns.append(ROW_NAME)
+        elif item_template.id == 'subtitle':
+            text_columns.append(ROW_GROUP)
+        else:
+            text_columns.append(None)
+
+        paragraph_props_xmls.append(paragraph_props_xml(
+            item_template.font_family,
+            item_template.font_size_pt,
+            item_template.font_weight_bold,
+            item_template.color_value,
+        ))
+
+    return TextLayouts(
+        text_columns=text_columns,
+        texts=[item.text for item in text_items_template],
+        left_rel_inch=left_rel_inch,
+        top_rel_inch=top_rel_inch,
+        box_width_emu=[int(box_width_inch * EMU_PER_INCH)] * len(text_columns),
+        box_height_emu=(box_height_inch * EMU_PER_INCH).astype(np.int64).tolist(),
+        paragraph_props_xmls=paragraph_props_xmls,
+    )
+
+# --- 🚀 FIX: 함수 로직을 명확하고 정확하게 전면 수정 ---
+def build_slide_shapes_xml(chunk_rows, first_shape_id, background_rId, card_origins, pic_size_emu, background_desc, text_layouts) -> str:
+    # 슬라이드 한 장의 도형 XML을 만드는 순수 함수 (슬라이드/패키지 객체를 건드리지 않음)
+    pic_width_emu, pic_height_emu = pic_size_emu
+    shape_id = first_shape_id
+    shape_xmls = []
+
+    # 각 그리드 칸(A4 1/4)에 카드 내용 배치
+    for i, card_row in enumerate(chunk_rows):
+        card_left_inch, card_top_inch = card_origins[i]
+
+        # 배경 이미지 배치 (찌그러짐 없음)
+        if background_rId is not None:
+            shape_xmls.append(PICTURE_XML % (
+                shape_id, shape_id - 1, background_desc, background_rId,
+                int(card_left_inch * EMU_PER_INCH), int(card_top_inch * EMU_PER_INCH),
+                pic_width_emu, pic_height_emu,
+            ))
+            shape_id += 1
+
+        # 텍스트 배치 (미리 계산된 상대 좌표 + 카드 위치, 카드 단위로 벡터 연산)
+        lefts_emu = ((card_left_inch + text_layouts.left_rel_inch) * EMU_PER_INCH).astype(np.int64).tolist()
+        tops_emu = ((card_top_inch + text_layouts.top_rel_inch) * EMU_PER_INCH).astype(np.int64).tolist()
+        for text_column, text, left_emu, top_emu, box_width_emu, box_height_emu, paragraph_props_xml in zip(
+            text_layouts.text_columns, text_layouts.texts, lefts_emu, tops_emu,
+            text_layouts.box_width_emu, text_layouts.box_height_emu, text_layouts.paragraph_props_xmls,
+        ):
+            text_content = card_row[text_column] if text_column is not None else text
+
+            shape_xmls.append(TEXTBOX_XML % (
+                shape_id, shape_id - 1,
+                left_emu, top_emu,
+                box_width_emu, box_height_emu,
+                paragraph_props_xml, text_runs_xml(text_content),
+            ))
+            shape_id += 1
+
+    return ''.join(shape_xmls)
+
+def append_shapes_xml(slide, shapes_xml: str):
+    # 슬라이드 도형 XML을 한 번에 파싱해서 spTree에 추가
+    if shapes_xml:
+        container = parse_xml(SHAPES_CONTAINER_XML % shapes_xml)
+        slide.shapes._spTree.extend(list(container))
 # --- FIX END ---
 
-@app.post("/generate-ppt")
-async def generate_ppt(data: CanvasData):
+def iter_file_chunks(file_obj, chunk_size: int):
+    # 파일을 일정 크기씩 읽어 내보내고, 다 보내면 (또는 연결이 끊기면) 닫음
+    try:
+        while True:
+            chunk = file_obj.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        file_obj.close()
+
+def build_presentation(data: CanvasData) -> tempfile.SpooledTemporaryFile:
+    # 이미지 디코딩/크롭/인코딩과 pptx 생성은 모두 블로킹 CPU 작업이므로 워커 스레드에서 실행
     prs = Presentation()
     
-    prs.slide_width = Inches(8.27)  # A4 가로
-    prs.slide_height = Inches(11.69) # A4 세로
+    prs.slide_width = A4_WIDTH
+    prs.slide_height = A4_HEIGHT
     
+    # excel 행을 요청 시작 시 한 번만 (이름, 그룹) 튜플로 변환 (카드마다 dict 조회를 하지 않음)
+    rows = [(row.get('name', ''), row.get('group', '')) for row in data.excel_data]
+
+    # 슬라이드당 4장씩 (슬라이드를 만들면서 필요한 만큼만 묶음)
     chunk_size = 4
-    data_chunks = [data.excel_data[i:i + chunk_size] for i in range(0, len(data.excel_data), chunk_size)]
 
     # --- 🚀 FIX: target_ratio 결정 로직 수정 ---
     # Flutter에서 보낸 canvas_aspect_ratio를 사용하고, 없으면 A4 1/4 비율로 대체
@@ -210,42 +433,93 @@ async def generate_ppt(data: CanvasData):
         target_ratio = data.canvas_aspect_ratio
     # --- FIX END ---
 
+    # 카드 배치와 텍스트 좌표/스타일은 모든 카드에서 동일하므로 한 번만 계산
+    card_origins, pic_width_inch, pic_height_inch = compute_card_layout(page_width_inch, page_height_inch, target_ratio)
+    text_layouts = precompute_text_layouts(data.text_items, data.canvas_size, pic_width_inch, pic_height_inch)
+
     cropped_background_stream = None
     if data.background_image_bytes:
         try:
-            img_bytes = base64.b64decode(data.background_image_bytes)
-            original_image = Image.open(io.BytesIO(img_bytes))
+            img_stream = decode_base64_chunked(data.background_image_bytes)
+            original_image = Image.open(img_stream)
             # 위에서 결정된 target_ratio로 이미지를 자름
-            cropped_image = crop_image_to_ratio(original_image, target_ratio)
-            cropped_background_stream = io.BytesIO()
-            cropped_image.save(cropped_background_stream, format=original_image.format or 'PNG')
-            cropped_background_stream.seek(0)
+            cropped_image, cropped = crop_image_to_ratio(original_image, target_ratio)
+            # 카드에 그려질 크기보다 큰 이미지는 줄임
+            target_width_px = int(pic_width_inch * BACKGROUND_TARGET_DPI)
+            background_image, resized = downscale_image_to_width(cropped_image, target_width_px, target_ratio)
+            if cropped or resized:
+                cropped_background_stream = io.BytesIO()
+                if background_image.mode == 'RGB':
+                    # 알파 채널이 없으면 PNG(DEFLATE)보다 훨씬 빠르고 작은 JPEG으로 저장
+                    background_image.save(cropped_background_stream, format='JPEG', quality=BACKGROUND_JPEG_QUALITY)
+                else:
+                    background_image.save(cropped_background_stream, format=original_image.format or 'PNG')
+                cropped_background_stream.seek(0)
+            else:
+                # 비율과 크기가 이미 맞으면 재인코딩 없이 디코딩한 스트림을 그대로 사용
+                img_stream.seek(0)
+                cropped_background_stream = img_stream
         except Exception as e:
             print(f"Error processing background image: {e}")
-            
-    for chunk in data_chunks:
-        slide_layout = prs.slide_layouts[6]
-        slide = prs.slides.add_slide(slide_layout)
-        
-        # --- 🚀 FIX: 수정된 함수에 target_ratio 전달 ---
-        add_cards_on_slide(
-            slide=slide,
-            chunk_data=chunk,
-            text_items_template=data.text_items,
-            canvas_size=data.canvas_size,
-            cropped_background_stream=cropped_background_stream,
-            target_card_ratio=target_ratio,
-        )
+
+    # 배경 이미지를 한 번만 해시/등록하고 모든 슬라이드에서 같은 ImagePart를 재사용
+    background_image_part = None
+    if cropped_background_stream:
+        background_image_part = prs.part.package.get_or_add_image_part(cropped_background_stream)
+
+    pic_size_emu = (int(pic_width_inch * EMU_PER_INCH), int(pic_height_inch * EMU_PER_INCH))
+    background_desc = escape(background_image_part.desc) if background_image_part is not None else None
+
+    slide_layout = prs.slide_layouts[6]
+    layout_placeholders = list(slide_layout.iter_cloneable_placeholders())
+    # 다음 슬라이드 ID는 한 번만 계산하고 이후에는 1씩 증가
+    next_slide_id = prs.slides._sldIdLst._next_id
+    for chunk in batched(rows, chunk_size):
+        slide = add_slide_fast(prs, slide_layout, layout_placeholders, next_slide_id)
+        next_slide_id += 1
+
+        # 배경 이미지 파트는 프레젠테이션에 한 번만 등록되어 있으므로 슬라이드당 관계(rId)만 추가
+        background_rId = None
+        if background_image_part is not None:
+            background_rId = slide.part.relate_to(background_image_part, RT.IMAGE)
+
+        # --- 🚀 FIX: 미리 계산된 카드/텍스트 배치로 슬라이드 도형 XML 생성 ---
+        append_shapes_xml(slide, build_slide_shapes_xml(
+            chunk, slide.shapes._next_shape_id, background_rId,
+            card_origins, pic_size_emu, background_desc, text_layouts,
+        ))
         # --- FIX END ---
 
-    file_stream = io.BytesIO()
+    # 전체 결과를 bytes로 한 번 더 복사하지 않도록 (큰 덱은 디스크로 넘어가는) 임시 파일에 저장
+    file_stream = tempfile.SpooledTemporaryFile(max_size=PPTX_SPOOL_MAX_BYTES)
     prs.save(file_stream)
     file_stream.seek(0)
+    return file_stream
+
+@app.post("/generate-ppt", openapi_extra={
+    "requestBody": {"required": True, "content": {"application/json": {"schema": CANVAS_DATA_SCHEMA}}},
+})
+async def generate_ppt(request: Request):
+    # 요청 본문을 그대로 받아 msgspec으로 디코딩+검증 (FastAPI/Pydantic의 파싱 단계를 건너뜀)
+    body = await request.body()
+    try:
+        data = canvas_data_decoder.decode(body)
+    except msgspec.DecodeError as e:
+        # 검증 오류(ValidationError)와 JSON 문법 오류 모두 기존과 같은 형식의 422로 응답
+        raise HTTPException(status_code=422, detail=request_error_detail(e))
+
+    # 이벤트 루프를 막지 않도록 스레드풀에서 생성 (다른 요청이 대기하지 않음)
+    file_stream = await run_in_threadpool(build_presentation, data)
+    content_length = file_stream.seek(0, io.SEEK_END)
+    file_stream.seek(0)
 
-    return Response(
-        content=file_stream.getvalue(),
+    return StreamingResponse(
+        iter_file_chunks(file_stream, PPTX_STREAM_CHUNK_BYTES),
         media_type="application/vnd.openxmlformats-officedocument.presentationml.presentation",
-        headers={"Content-Disposition": "attachment; filename=generated_A4.pptx"}
+        headers={
+            "Content-Disposition": "attachment; filename=generated_A4.pptx",
+            "Content-Length": str(content_length),
+        }
     )
 
 if __name__ == "__main__":